@@ -125,8 +125,7 @@ async def main():
         logging.error(f"Error during scraping: {str(e)}")
     finally:
         # Ensure proper cleanup
-        if scraper.session:
-            await scraper.session.close()
+        await scraper.close()
 
 
 if __name__ == "__main__":
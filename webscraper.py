@@ -1,26 +1,90 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+import lxml.html
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit
 import validators
-import html2text
 from tqdm import tqdm
 import os
-import json
-from typing import Set, Dict, List, Optional, Union, Any
+import orjson
+import aiofiles
+from typing import Set, Dict, List, Optional, Tuple, Union, Any
 import logging
 import time
 import asyncio
 import aiohttp
-from fake_useragent import UserAgent
-from tenacity import retry, stop_after_attempt, wait_exponential
 from urllib import robotparser
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 import hashlib
+import random
 import re
 from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# Single characters removed by RagScraper._clean_content_for_rag
+_RAG_TRANS = str.maketrans('', '', '¶')  # Remove paragraph marks
+
+# Common unwanted elements removed by RagScraper._clean_content_for_rag,
+# fused into a single alternation so the content is scanned only once
+_RAG_NOISE = re.compile('|'.join(f'(?:{pattern})' for pattern in [
+    r'\[.*?\]',  # Remove square bracket content
+    r'©.*?(?=\n|$)',  # Remove copyright notices
+    r'Cookie.*?(?=\n|$)',  # Remove cookie notices
+    r'Privacy.*?(?=\n|$)',  # Remove privacy notices
+    r'\d+\s*min read',  # Remove read time estimates
+    r'Last updated:.*?(?=\n|$)',  # Remove update timestamps
+    r'Share on.*?(?=\n|$)',  # Remove share buttons text
+    r'Follow us on.*?(?=\n|$)',  # Remove social media text
+]))
+_WS = re.compile(r'\s+')
+_BLANK_RUNS = re.compile(r'\n\s*\n| +')
+
+# Browser user agents rotated across requests
+_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:121.0) Gecko/20100101 Firefox/121.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+)
+
+# XML declaration that lxml refuses to parse from an already-decoded string
+_XML_DECL = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# Elements dropped before extraction, and the tags collected from what remains
+_DROP_TAGS = ['script', 'style', 'nav', 'footer', 'iframe', 'noscript']
+_HEADER_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_MAIN_TAGS = {'main', 'article', 'body'}
+
+# Retries of a single page (including backoff waits) must fit in this many seconds
+_RETRY_BUDGET = 20.0
+
+# Indexes covering more pages than this are written without indentation
+_INDEX_INDENT_MAX_PAGES = 1000
+
+# Ports dropped from URLs when canonicalising, as they are the scheme default
+_DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+# robots.txt handling: only the first 500 KB is honoured (as Google does) and
+# parsed rules are reused for this many seconds before being fetched again;
+# failed fetches (5xx or network errors) are retried much sooner
+_ROBOTS_MAX_BYTES = 500 * 1024
+_ROBOTS_TTL = 12 * 60 * 60
+_ROBOTS_RETRY_TTL = 5 * 60
+
+
+def _collapse_blank_run(match: re.Match) -> str:
+    """Replace a run of blank lines with one newline and a run of spaces with one space"""
+    return '\n' if match.group().startswith('\n') else ' '
+
+
 class RagScraper:
     """
     RagScraper: A web scraper optimized for RAG (Retrieval-Augmented Generation) applications.
@@ -35,23 +99,29 @@ class RagScraper:
     """
     def __init__(self, base_url: str, output_dir: str = "data/scraped_content", 
                  rate_limit: float = 1.0, max_retries: int = 3,
-                 respect_robots: bool = True, max_workers: int = 5):
+                 respect_robots: bool = True, max_workers: int = 5,
+                 max_content_size: int = 10 * 1024 * 1024):
         """
         Initialize the WebScraper with enhanced configuration.
         
         Args:
             base_url (str): The base URL to scrape
             output_dir (str): Directory to save scraped content (default: data/scraped_content)
-            rate_limit (float): Minimum time between requests in seconds
+            rate_limit (float): Minimum time between requests to the same host in seconds
             max_retries (int): Maximum number of retry attempts for failed requests
             respect_robots (bool): Whether to respect robots.txt rules
             max_workers (int): Maximum number of concurrent workers for async operations
+            max_content_size (int): Maximum response body size in bytes; larger pages are skipped
         """
         if not validators.url(base_url):
             raise ValueError("Invalid URL provided")
             
         self.base_url = base_url
-        self.domain = urlparse(base_url).netloc
+        parsed_base = urlparse(base_url)
+        self.domain = parsed_base.netloc
+        
+        # Prefix used to classify canonical links as internal without parsing each one
+        self._internal_prefix = self._canonicalize(f'{parsed_base.scheme}://{self.domain}/')
         
         # Create a domain-specific output directory
         domain_dir = self.domain.replace(":", "_").replace("/", "_")
@@ -65,29 +135,27 @@ class RagScraper:
         self.rate_limit = rate_limit
         self.max_retries = max_retries
         self.max_workers = max_workers
+        self.max_content_size = max_content_size
         self.visited_urls: Set[str] = set()
-        self.last_request_time = 0
+        self._filename_cache: Dict[str, str] = {}
         
-        # Initialize HTML converter
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = False
-        self.html_converter.body_width = 0  # No wrapping
+        # Per-host rate limiting state
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._host_last: Dict[str, float] = {}
         
         # Setup logging
         self._setup_logging()
         
-        # Initialize robots.txt parser
+        # robots.txt rules are fetched lazily and cached per host
         self.respect_robots = respect_robots
-        if respect_robots:
-            self._setup_robots_parser()
-        
-        # Initialize user agent rotator
-        self.ua = UserAgent()
+        self._robots_cache: Dict[str, Tuple[robotparser.RobotFileParser, float]] = {}
         
         # Initialize async session
         self.session = None
         
+        # Parsing and cleaning are CPU-bound and run off the event loop
+        self._parse_pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        
     def _setup_logging(self):
         """Configure logging with detailed formatting"""
         # Create a logger for this instance
@@ -118,77 +186,218 @@ class RagScraper:
         # Prevent propagation to root logger
         self.logger.propagate = False
 
-    def _setup_robots_parser(self):
-        """Initialize and fetch robots.txt rules"""
-        self.rp = robotparser.RobotFileParser()
-        robots_url = urljoin(self.base_url, '/robots.txt')
+    async def _get_robots(self, scheme: str, host: str) -> robotparser.RobotFileParser:
+        """Fetch robots.txt rules for a host, reusing cached rules until they expire"""
+        cached = self._robots_cache.get(host)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+
+        rp = robotparser.RobotFileParser()
+        robots_url = f"{scheme}://{host}/robots.txt"
+        ttl = _ROBOTS_TTL
         try:
-            self.rp.set_url(robots_url)
-            self.rp.read()
-            self.logger.info(f"Successfully parsed robots.txt from {robots_url}")
+            async with self._get_session().get(robots_url) as response:
+                if response.status == 200:
+                    text = await self._read_body(response, robots_url, _ROBOTS_MAX_BYTES,
+                                                 truncate=True)
+                    rp.parse(text.splitlines())
+                    self.logger.info(f"Successfully parsed robots.txt from {robots_url}")
+                elif response.status in (401, 403):
+                    rp.disallow_all = True
+                elif 400 <= response.status < 500:
+                    rp.allow_all = True
+                else:
+                    # Server errors mean the rules are unknown, so nothing may be fetched
+                    self.logger.warning(f"Could not fetch robots.txt: Status {response.status}")
+                    rp.disallow_all = True
+                    ttl = _ROBOTS_RETRY_TTL
         except Exception as e:
             self.logger.warning(f"Could not fetch robots.txt: {str(e)}")
-            self.rp = None
+            rp.allow_all = True
+            ttl = _ROBOTS_RETRY_TTL
 
-    def _can_fetch(self, url: str) -> bool:
+        # Cache the rules together with the time they expire
+        self._robots_cache[host] = (rp, time.monotonic() + ttl)
+        return rp
+
+    async def _can_fetch(self, url: str) -> bool:
         """Check if URL can be fetched according to robots.txt"""
-        if not self.respect_robots or self.rp is None:
+        if not self.respect_robots:
             return True
-        return self.rp.can_fetch("*", url)
+        parsed_url = urlparse(url)
+        rp = await self._get_robots(parsed_url.scheme, parsed_url.netloc)
+        return rp.can_fetch("*", url)
+
+    def _host_rate(self, host: str) -> float:
+        """Minimum delay between requests to a host, honouring robots.txt Crawl-delay"""
+        cached = self._robots_cache.get(host)
+        crawl_delay = cached[0].crawl_delay("*") if cached else None
+        return max(self.rate_limit, float(crawl_delay or 0))
 
-    def _rate_limit_delay(self):
-        """Implement rate limiting between requests"""
-        if self.rate_limit > 0:
-            elapsed = time.time() - self.last_request_time
-            if elapsed < self.rate_limit:
-                time.sleep(self.rate_limit - elapsed)
-        self.last_request_time = time.time()
+    async def _rate_limit_delay(self, host: str) -> None:
+        """Wait until the next request to host is allowed without blocking other hosts"""
+        async with self._host_locks.setdefault(host, asyncio.Lock()):
+            loop = asyncio.get_running_loop()
+            last = self._host_last.get(host)
+            if last is not None:
+                delay = self._host_rate(host) - (loop.time() - last)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._host_last[host] = loop.time()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it inside the running event loop
+        on first use so connections and DNS lookups are reused across the crawl.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_workers * 4,
+                limit_per_host=self.max_workers,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self.session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session"""
+        if self.session:
+            await self.session.close()
+            self.session = None
+
+    def _retry_after(self, response: aiohttp.ClientResponse) -> Optional[float]:
+        """Seconds to wait before retrying, from the Retry-After header if present"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def _fetch_page(self, url: str) -> Optional[str]:
         """
         Fetch page content with retry logic and rate limiting.
+        
+        Only connection errors, timeouts, 429 and 5xx responses are retried, with
+        exponential backoff or the server's Retry-After, within _RETRY_BUDGET seconds.
         """
-        if not self._can_fetch(url):
+        if not await self._can_fetch(url):
             self.logger.warning(f"URL not allowed by robots.txt: {url}")
             return None
 
-        self._rate_limit_delay()
-        
-        headers = {'User-Agent': self.ua.random}
-        try:
-            if self.session is None:
-                self.session = aiohttp.ClientSession()
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _RETRY_BUDGET
+        for attempt in range(self.max_retries + 1):
+            await self._rate_limit_delay(host)
             
-            async with self.session.get(url, headers=headers, timeout=30) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    self.logger.error(f"Failed to fetch {url}: Status {response.status}")
-                    return None
-        except Exception as e:
-            self.logger.error(f"Error fetching {url}: {str(e)}")
-            raise
+            headers = {'User-Agent': random.choice(_USER_AGENTS)}
+            backoff = min(2 ** attempt, 10)
+            try:
+                async with self._get_session().get(url, headers=headers) as response:
+                    if response.status == 200:
+                        return await self._read_body(response, url, self.max_content_size)
+                    if response.status != 429 and response.status < 500:
+                        self.logger.error(f"Failed to fetch {url}: Status {response.status}")
+                        return None
+                    error = f"Status {response.status}"
+                    delay = self._retry_after(response)
+                    if delay is None:
+                        delay = backoff
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+                delay = backoff
+            except aiohttp.ClientError as e:
+                self.logger.error(f"Error fetching {url}: {str(e)}")
+                return None
+
+            if attempt == self.max_retries or loop.time() + delay > deadline:
+                break
+            self.logger.warning(f"Retrying {url} in {delay:.1f}s: {error}")
+            await asyncio.sleep(delay)
+
+        self.logger.error(f"Failed to fetch {url}: {error}")
+        return None
 
-    def _get_soup(self, html: str) -> Optional[BeautifulSoup]:
-        """Parse HTML content into BeautifulSoup object"""
+    async def _read_body(self, response: aiohttp.ClientResponse, url: str,
+                         max_bytes: int, truncate: bool = False) -> Optional[str]:
+        """
+        Stream a response body into memory. Bodies over max_bytes are cut off
+        when truncate is set and rejected otherwise.
+        """
+        too_large = response.content_length is not None and response.content_length > max_bytes
+        if too_large and not truncate:
+            self.logger.error(f"Response from {url} exceeds {max_bytes} bytes, skipping")
+            return None
+
+        buf = bytearray()
+        async for chunk in response.content.iter_chunked(65536):
+            buf += chunk
+            if len(buf) > max_bytes:
+                if truncate:
+                    del buf[max_bytes:]
+                    break
+                self.logger.error(f"Response from {url} exceeds {max_bytes} bytes, skipping")
+                return None
+
+        try:
+            return buf.decode(response.charset or 'utf-8', errors='replace')
+        except LookupError:
+            # Unknown charset advertised by the server
+            return buf.decode('utf-8', errors='replace')
+
+    def _parse_html(self, html: str) -> Optional[lxml.html.HtmlElement]:
+        """Parse HTML content into an lxml element tree"""
         try:
-            return BeautifulSoup(html, 'html5lib')
+            return lxml.html.document_fromstring(_XML_DECL.sub('', html, count=1))
         except Exception as e:
             self.logger.error(f"Error parsing HTML: {str(e)}")
             return None
 
-    def _extract_content(self, soup: BeautifulSoup, url: str) -> Dict[str, Union[str, Dict]]:
+    def _extract_content(self, root: lxml.html.HtmlElement, url: str) -> Dict[str, Union[str, Dict]]:
         """
         Extract and clean content from the page with enhanced metadata.
         """
-        # Remove unwanted elements
-        for element in soup.find_all(['script', 'style', 'nav', 'footer', 'iframe', 'noscript']):
-            element.decompose()
+        # Remove unwanted elements (their tail text is kept)
+        for element in list(root.iter(*_DROP_TAGS)):
+            element.drop_tree()
+
+        # Collect the tags needed below in a single walk over the remaining tree
+        title_tag = None
+        main_tags = {}
+        meta_tags = []
+        header_tags = []
+        anchors = []
+        for tag in root.iter():
+            name = tag.tag
+            if name == 'a':
+                if tag.get('href') is not None:
+                    anchors.append(tag)
+            elif name in _HEADER_TAGS:
+                header_tags.append(tag)
+            elif name == 'meta':
+                meta_tags.append(tag)
+            elif name in _MAIN_TAGS:
+                main_tags.setdefault(name, tag)
+            elif name == 'title' and title_tag is None:
+                title_tag = tag
 
         content = {
             'url': url,
-            'title': soup.title.string.strip() if soup.title else '',
+            'title': title_tag.text_content().strip() if title_tag is not None else '',
             'main_content': '',
             'metadata': {},
             'timestamp': datetime.now().isoformat(),
@@ -197,54 +406,73 @@ class RagScraper:
         }
 
         # Extract meta tags
-        meta_tags = soup.find_all('meta')
         for meta in meta_tags:
             name = meta.get('name', meta.get('property', ''))
             if name:
                 content['metadata'][name] = meta.get('content', '')
 
         # Extract headers for structure
-        for header in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        for header in header_tags:
             content['headers'].append({
-                'level': int(header.name[1]),
-                'text': header.get_text(strip=True)
+                'level': int(header.tag[1]),
+                'text': ' '.join(header.text_content().split())
             })
 
-        # Extract main content
-        main_content = soup.find('main') or soup.find('article') or soup.find('body')
-        if main_content:
-            content['main_content'] = self.html_converter.handle(str(main_content))
+        # Extract main content, one line per text block
+        for name in ('main', 'article', 'body'):
+            main_content = main_tags.get(name)
+            if main_content is not None:
+                lines = (text.strip() for text in main_content.itertext())
+                content['main_content'] = '\n'.join(line for line in lines if line)
+                break
 
         # Extract links
-        content['links'] = self._get_links(soup, url)
+        content['links'] = self._get_links(anchors, url)
 
         return content
 
-    def _get_links(self, soup: BeautifulSoup, current_url: str) -> List[Dict[str, str]]:
-        """Extract and classify links from the page"""
+    def _get_links(self, anchors: List[lxml.html.HtmlElement], current_url: str) -> List[Dict[str, str]]:
+        """Classify the page's <a href> tags as internal or external links"""
+        parsed_url = urlparse(current_url)
+        origin = f'{parsed_url.scheme}://{parsed_url.netloc}'
         links = []
-        for link in soup.find_all('a', href=True):
-            url = urljoin(current_url, link['href'])
-            parsed_url = urlparse(url)
-            if parsed_url.netloc == self.domain and '#' not in url:
-                links.append({
-                    'url': url,
-                    'text': link.get_text(strip=True),
-                    'title': link.get('title', ''),
-                    'type': 'internal'
-                })
+        for link in anchors:
+            href = link.get('href').strip()
+            if href.startswith('/') and not href.startswith('//'):
+                url = origin + href
+            elif href.startswith(('http://', 'https://')):
+                url = href
             else:
-                links.append({
-                    'url': url,
-                    'text': link.get_text(strip=True),
-                    'title': link.get('title', ''),
-                    'type': 'external'
-                })
+                # Page-relative, protocol-relative and non-HTTP links need full resolution
+                url = urljoin(current_url, href)
+            url = self._canonicalize(url)
+            is_internal = url.startswith(self._internal_prefix)
+            links.append({
+                'url': url,
+                'text': ' '.join(link.text_content().split()),
+                'title': link.get('title', ''),
+                'type': 'internal' if is_internal else 'external'
+            })
         return links
 
+    def _canonicalize(self, url: str) -> str:
+        """Normalise a URL so the same page is only queued and visited once"""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        default_port = _DEFAULT_PORTS.get(scheme)
+        if default_port and netloc.endswith(default_port):
+            netloc = netloc[:-len(default_port)]
+        path = parts.path or ('/' if netloc else '')
+        return urlunsplit((scheme, netloc, path, parts.query, ''))
+
     def _generate_filename(self, url: str) -> str:
-        """Generate a unique filename for a URL using SHA-256"""
-        return hashlib.sha256(url.encode()).hexdigest()[:16] + '.json'
+        """Generate a unique filename for a URL using BLAKE2b, cached per URL"""
+        filename = self._filename_cache.get(url)
+        if filename is None:
+            filename = hashlib.blake2b(url.encode(), digest_size=8).hexdigest() + '.json'
+            self._filename_cache[url] = filename
+        return filename
 
     def _clean_content_for_rag(self, content: str) -> str:
         """
@@ -252,33 +480,33 @@ class RagScraper:
         Removes unwanted elements and normalizes the text.
         """
         # Remove special characters and normalize whitespace
-        cleaned = re.sub(r'\s+', ' ', content)
+        cleaned = content.translate(_RAG_TRANS)
+        cleaned = _WS.sub(' ', cleaned)
         
         # Remove common unwanted elements
-        patterns_to_remove = [
-            r'¶',  # Remove paragraph marks
-            r'\[.*?\]',  # Remove square bracket content
-            r'©.*?(?=\n|$)',  # Remove copyright notices
-            r'Cookie.*?(?=\n|$)',  # Remove cookie notices
-            r'Privacy.*?(?=\n|$)',  # Remove privacy notices
-            r'\d+\s*min read',  # Remove read time estimates
-            r'Last updated:.*?(?=\n|$)',  # Remove update timestamps
-            r'Share on.*?(?=\n|$)',  # Remove share buttons text
-            r'Follow us on.*?(?=\n|$)',  # Remove social media text
-        ]
-        
-        for pattern in patterns_to_remove:
-            cleaned = re.sub(pattern, '', cleaned)
+        cleaned = _RAG_NOISE.sub('', cleaned)
         
         # Remove multiple newlines and spaces
-        cleaned = re.sub(r'\n\s*\n', '\n', cleaned)
-        cleaned = re.sub(r' +', ' ', cleaned)
+        cleaned = _BLANK_RUNS.sub(_collapse_blank_run, cleaned)
         
         # Remove leading/trailing whitespace from each line
         cleaned = '\n'.join(line.strip() for line in cleaned.split('\n'))
         
         return cleaned.strip()
 
+    def _parse_and_extract(self, html: str, url: str) -> Dict[str, Any]:
+        """
+        Parse, extract and clean a page. Runs in the parse pool so the CPU-heavy
+        work does not block the event loop.
+        """
+        root = self._parse_html(html)
+        if root is None:
+            return {}
+        
+        content = self._extract_content(root, url)
+        content['rag_content'] = self._clean_content_for_rag(content['main_content'])
+        return content
+
     async def scrape_page(self, url: str) -> Dict[str, Any]:
         """
         Scrape a single page asynchronously.
@@ -289,74 +517,94 @@ class RagScraper:
         if not html:
             return {}
         
-        soup = self._get_soup(html)
-        if not soup:
+        loop = asyncio.get_running_loop()
+        content = await loop.run_in_executor(self._parse_pool, self._parse_and_extract, html, url)
+        if not content:
             return {}
         
-        content = self._extract_content(soup, url)
-        rag_content = self._clean_content_for_rag(content['main_content'])
-        content['rag_content'] = rag_content
-        self._save_content(url, content)
+        await self._save_content(url, content)
         return content
 
+    async def _crawl_worker(self, queue: asyncio.Queue, scraped_content: Dict[str, Dict[str, Any]],
+                            max_pages: Optional[int], pbar: tqdm) -> None:
+        """Take URLs off the crawl queue and scrape them until cancelled"""
+        while True:
+            url = await queue.get()
+            try:
+                if url in self.visited_urls:
+                    continue
+                if max_pages is not None and len(self.visited_urls) >= max_pages:
+                    continue
+                self.visited_urls.add(url)
+                
+                try:
+                    result = await self.scrape_page(url)
+                except Exception as e:
+                    self.logger.error(f"Error processing {url}: {str(e)}")
+                    continue
+                
+                if result:
+                    scraped_content[url] = result
+                    # Add new URLs to queue
+                    for link in result.get('links', []):
+                        if link['type'] == 'internal' and link['url'] not in self.visited_urls:
+                            queue.put_nowait(link['url'])
+                
+                pbar.update(1)
+            finally:
+                queue.task_done()
+
     async def scrape_website(self, max_pages: Optional[int] = None) -> None:
         """
         Scrape the entire website asynchronously with concurrent workers.
         """
         try:
-            queue = [self.base_url]
+            queue: asyncio.Queue = asyncio.Queue()
+            queue.put_nowait(self._canonicalize(self.base_url))
             scraped_content = {}
             
             with tqdm(total=max_pages or float('inf'), desc="Scraping pages") as pbar:
-                while queue and (max_pages is None or len(self.visited_urls) < max_pages):
-                    # Process URLs in batches
-                    batch = queue[:self.max_workers]
-                    queue = queue[self.max_workers:]
-                    
-                    tasks = []
-                    for url in batch:
-                        if url not in self.visited_urls:
-                            self.visited_urls.add(url)
-                            tasks.append(self.scrape_page(url))
-                    
-                    if tasks:
-                        results = await asyncio.gather(*tasks, return_exceptions=True)
-                        for url, result in zip(batch, results):
-                            if isinstance(result, Exception):
-                                self.logger.error(f"Error processing {url}: {str(result)}")
-                                continue
-                            
-                            if result:
-                                scraped_content[url] = result
-                                # Add new URLs to queue
-                                new_urls = [link['url'] for link in result.get('links', [])
-                                          if link['type'] == 'internal' and 
-                                          link['url'] not in self.visited_urls]
-                                queue.extend(new_urls)
-                            
-                            pbar.update(1)
+                # Each worker picks up the next URL as soon as it finishes one
+                workers = [
+                    asyncio.create_task(self._crawl_worker(queue, scraped_content, max_pages, pbar))
+                    for _ in range(self.max_workers)
+                ]
+                try:
+                    await queue.join()
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
             
             # Save index of all scraped pages
-            self._save_index(scraped_content)
+            await self._save_index(scraped_content)
         
         finally:
             # Always close the session
-            if self.session:
-                await self.session.close()
-                self.session = None
+            await self.close()
 
-    def _save_content(self, url: str, content: Dict[str, str]) -> None:
-        """Save scraped content to a file with error handling"""
+    async def _save_content(self, url: str, content: Dict[str, str]) -> None:
+        """
+        Save scraped content to a file with error handling. The RAG text goes to
+        a .txt file next to the page's JSON instead of being duplicated inside it.
+        """
         try:
             filename = self._generate_filename(url)
             filepath = os.path.join(self.output_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(content, f, ensure_ascii=False, indent=2)
+            page = {key: value for key, value in content.items() if key != 'rag_content'}
+            data = orjson.dumps(page)
+            async with aiofiles.open(filepath, 'wb') as f:
+                await f.write(data)
+            del data
+            
+            rag_filepath = os.path.splitext(filepath)[0] + '.txt'
+            async with aiofiles.open(rag_filepath, 'w', encoding='utf-8') as f:
+                await f.write(content.get('rag_content', ''))
         except Exception as e:
             self.logger.error(f"Error saving content for {url}: {str(e)}")
 
-    def _save_index(self, content: Dict[str, Dict[str, str]]) -> None:
+    async def _save_index(self, content: Dict[str, Dict[str, str]]) -> None:
         """Save enhanced index of all scraped pages"""
         index = {
             'base_url': self.base_url,
@@ -371,20 +619,23 @@ class RagScraper:
             } for url, page_content in content.items()]
         }
         
-        with open(os.path.join(self.output_dir, 'index.json'), 'w', encoding='utf-8') as f:
-            json.dump(index, f, ensure_ascii=False, indent=2)
+        # Indentation slows serialisation and roughly doubles the file size, so
+        # only keep it while the index is small enough to be read by hand
+        option = orjson.OPT_INDENT_2 if len(content) <= _INDEX_INDENT_MAX_PAGES else None
+        data = orjson.dumps(index, option=option)
+        async with aiofiles.open(os.path.join(self.output_dir, 'index.json'), 'wb') as f:
+            await f.write(data)
 
     def get_statistics(self) -> Dict[str, Union[int, List[str]]]:
         """Get scraping statistics"""
+        # One directory scan replaces the per-URL existence checks; sizes still
+        # need one stat per saved file
+        with os.scandir(self.output_dir) as it:
+            entries = [entry for entry in it if entry.name.endswith(('.json', '.txt'))]
+        saved_files = {entry.name for entry in entries}
         return {
             'total_pages': len(self.visited_urls),
-            'failed_urls': [url for url in self.visited_urls 
-                          if not os.path.exists(os.path.join(
-                              self.output_dir, 
-                              self._generate_filename(url)))],
-            'total_content_size': sum(
-                os.path.getsize(os.path.join(self.output_dir, f))
-                for f in os.listdir(self.output_dir)
-                if f.endswith('.json')
-            )
+            'failed_urls': [url for url in self.visited_urls
+                          if self._generate_filename(url) not in saved_files],
+            'total_content_size': sum(entry.stat().st_size for entry in entries)
         }